@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import json
 import textwrap
 from typing import TYPE_CHECKING
 
@@ -21,8 +22,21 @@ if TYPE_CHECKING:
 QUARTILES = ("bottom", "2nd", "3rd", "top")
 
 
-def percentile(x: npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
-    return x.argsort().argsort() * 100 // len(x)
+def hash_frame(data: pl.DataFrame) -> bytes:
+    return data.hash_rows().to_numpy().tobytes()
+
+
+def quartile_breaks(n_participants: int) -> list[float]:
+    # Same breaks as qcut(4): linearly interpolated quartiles of the percentiles.
+    breaks: list[float] = []
+    for k in range(1, len(QUARTILES)):
+        pos = k * (n_participants - 1) / len(QUARTILES)
+        lo = int(pos)
+        lo_pct = lo * 100 // n_participants
+        hi_pct = (lo + 1) * 100 // n_participants
+        breaks.append(lo_pct + (pos - lo) * (hi_pct - lo_pct))
+    return breaks
+
 
 def generate_data(
     n_participants: int,
@@ -30,30 +44,50 @@ def generate_data(
     random_seed: int,
 ) -> pl.DataFrame:
     rng = np.random.default_rng(random_seed)
-    test_score = rng.normal(size=n_participants)
-    perceived_ability = (
-        corr_coef * test_score +
-        np.sqrt(1 - corr_coef * corr_coef) * rng.normal(size=n_participants)
-    )
+    test_score, noise = rng.standard_normal(size=(2, n_participants))
+    if corr_coef == 0:
+        perceived_ability = noise
+    elif corr_coef == 1:
+        perceived_ability = test_score
+    else:
+        perceived_ability = (
+            corr_coef * test_score + np.sqrt(1 - corr_coef * corr_coef) * noise
+        )
 
+    breaks = quartile_breaks(n_participants)
     return (
-        pl.DataFrame({
-            "test_score": test_score,
-            "perceived_ability": perceived_ability,
-            "test_score_percentile": percentile(test_score),
-            "perceived_ability_percentile": percentile(perceived_ability),
-        })
+        pl.DataFrame(
+            {"test_score": test_score, "perceived_ability": perceived_ability},
+            schema={"test_score": pl.Float64, "perceived_ability": pl.Float64},
+        )
+        .with_columns(
+            ((pl.col("test_score").rank("ordinal") - 1) * 100 // n_participants)
+                .cast(pl.UInt8)
+                .alias("test_score_percentile"),
+            ((pl.col("perceived_ability").rank("ordinal") - 1) * 100 // n_participants)
+                .cast(pl.UInt8)
+                .alias("perceived_ability_percentile"),
+        )
         .with_columns(
-            pl.col("test_score_percentile")
-                .qcut(4, labels=QUARTILES)
+            pl.sum_horizontal(
+                pl.col("test_score_percentile") > brk for brk in breaks
+            )
+                .cast(pl.UInt8)
                 .alias("test_score_quartile"),
-            pl.col("perceived_ability_percentile")
-                .qcut(4, labels=QUARTILES)
+            pl.sum_horizontal(
+                pl.col("perceived_ability_percentile") > brk for brk in breaks
+            )
+                .cast(pl.UInt8)
                 .alias("perceived_ability_quartile"),
         )
     )
 
 
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    hash_funcs={pl.DataFrame: hash_frame},
+)
 def create_point_chart(data: pl.DataFrame, x: str, y: str) -> alt.Chart:
     return alt.Chart(data).mark_point().encode(
         alt.X(f"{x}:Q").title(x.replace("_", " ")),  # type: ignore
@@ -61,27 +95,39 @@ def create_point_chart(data: pl.DataFrame, x: str, y: str) -> alt.Chart:
     )
 
 
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    hash_funcs={pl.DataFrame: hash_frame},
+)
 def create_quartile_chart(data: pl.DataFrame, quartile_col: str) -> alt.Chart:
+    quartiles = data.get_column(quartile_col).to_numpy()
+    counts = np.bincount(quartiles, minlength=len(QUARTILES))
+
+    def average(col: str) -> npt.NDArray[np.float64]:
+        weights = data.get_column(col).to_numpy()
+        return np.bincount(quartiles, weights, len(QUARTILES)) / counts
+
+    variables = ("test score", "perceived ability")
     return (
-        data.select(
-            quartile_col,
-            pl.col("test_score_percentile").alias("test score"),
-            pl.col("perceived_ability_percentile").alias("perceived ability"),
-        )
-        .group_by(quartile_col)
-        .mean()
-        .unpivot(index=quartile_col, value_name="average")
+        pl.DataFrame({
+            quartile_col: list(range(len(QUARTILES))) * len(variables),
+            "variable": [var for var in variables for _ in QUARTILES],
+            "average": np.concatenate((
+                average("test_score_percentile"),
+                average("perceived_ability_percentile"),
+            )),
+        })
         .pipe(alt.Chart)
         .mark_line(point=True)
         .encode(
             alt.Color("variable:N")
-                .sort(("test score", "perceived ability"))  # type: ignore
+                .sort(variables)  # type: ignore
                 .legend(orient="bottom-right")
                 .title(None),
-            alt.X(f"{quartile_col}:N")
-                .sort(QUARTILES)  # type: ignore
-                .axis(labelAngle=0)
-                .title(quartile_col.replace("_", " ")),
+            alt.X(f"{quartile_col}:O")
+                .axis(labelAngle=0, labelExpr=f"{json.dumps(QUARTILES)}[datum.value]")
+                .title(quartile_col.replace("_", " ")),  # type: ignore
             alt.Y("average:Q")
                 .scale(domain=(0, 100))
                 .title("average percentile"),  # type: ignore
@@ -114,30 +160,38 @@ def custom_theme() -> dict[str, Any]:
     }
 
 
-if __name__ == "__main__":
+@st.cache_resource
+def enable_custom_theme() -> None:
     alt.themes.register("custom_theme", custom_theme)
     alt.themes.enable("custom_theme")
 
-    with st.sidebar:
-        st.header("Parameters")
 
-        n_participants = st.slider(
-            label="Number of participants",
-            min_value=50,
-            max_value=150,
-            value=100,
-            step=10,
-        )
+if __name__ == "__main__":
+    enable_custom_theme()
 
-        corr_coef = st.slider(
-            label="Correlation",
-            min_value=0.0,
-            max_value=1.0,
-            value=0.5,
-            step=0.1,
-        )
+    with st.sidebar:
+        st.header("Parameters")
 
-        random_seed = st.number_input(label="Random seed", value=42)
+        with st.form("parameters", border=False):
+            n_participants = st.slider(
+                label="Number of participants",
+                min_value=50,
+                max_value=150,
+                value=100,
+                step=10,
+            )
+
+            corr_coef = st.slider(
+                label="Correlation",
+                min_value=0.0,
+                max_value=1.0,
+                value=0.5,
+                step=0.1,
+            )
+
+            random_seed = st.number_input(label="Random seed", value=42)
+
+            st.form_submit_button("Run simulation")
 
     data = generate_data(
         n_participants=n_participants,